@@ -7,19 +7,23 @@ from tqdm.notebook import tqdm
 
 
 
-def create_simple_features(data: list[dict]) -> pd.DataFrame:
+def create_simple_features(data: list[dict], verbose: bool = True) -> pd.DataFrame:
     """
     Extract battle-level features from Pokémon battle data.
     - Team stats
     - Status and boosts
     - KO count
+
+    Args:
+        data: list of battle dictionaries
+        verbose: if False, no progress bar (e.g. when scoring one battle at a time)
     """
 
     type_chart = get_type_chart()
 
     feature_list = []
 
-    for battle in tqdm(data, desc="Extracting features"):
+    for battle in tqdm(data, desc="Extracting features", disable=not verbose):
         features = {}
         battle_timeline = battle.get('battle_timeline', [])
         p1_team = battle.get('p1_team_details', [])
@@ -1,5 +1,6 @@
 from src.utils.get_type_chart import get_type_chart
-from src.utils.get_effectiveness import get_effectiveness
+from src.utils.extract_survivors import extract_survivors
+from src.utils.batch_type_hp_match_score import type_hp_match_scores
 from src.utils.type_resilience_score import type_resilience_score
 from src.utils.build_type_lookup import build_type_lookup
 import pandas as pd
@@ -9,7 +10,7 @@ from tqdm.notebook import tqdm
 
 
 
-def create_simple_features(data: list[dict], type_lookup: dict) -> pd.DataFrame:
+def create_simple_features(data: list[dict], type_lookup: dict, verbose: bool = True) -> pd.DataFrame:
     """
     Extracts features from Pokémon battle data.
     - Team stats
@@ -19,13 +20,20 @@ def create_simple_features(data: list[dict], type_lookup: dict) -> pd.DataFrame:
     - Type vulnerability
     - Survivors (alive count + types + HP)
     - NEW: type_hp_match_score -> comparative advantage between P1 and P2 survivors
+
+    Args:
+        data: list of battle dictionaries
+        type_lookup: dict mapping Pokémon name -> types
+        verbose: if False, no progress bar, prints or preview (e.g. when scoring one battle at a time)
     """
     feature_list = []
+    survivors = []
     type_chart = get_type_chart()
-    print("Building Pokémon type lookup table...")
+    if verbose:
+        print("Building Pokémon type lookup table...")
 
 
-    for battle in tqdm(data, desc="Extracting features"):
+    for battle in tqdm(data, desc="Extracting features", disable=not verbose):
         features = {}
         battle_timeline = battle.get('battle_timeline', [])
         if not battle_timeline:
@@ -75,40 +83,9 @@ def create_simple_features(data: list[dict], type_lookup: dict) -> pd.DataFrame:
         features['tempo_balance'] = features['p1_advantage_ratio'] - features['p2_advantage_ratio']
 
         # pokemon alive at the end of the 30 rounds
-        p1_alive, p2_alive = [], []
-        p1_hp_alive, p2_hp_alive = {}, {}
-        p1_types, p2_types = [], []
-
-        # Joueur 1
-        for poke in p1_team:
-            name = poke.get('name')
-            last_state = None
-            for turn in reversed(battle_timeline[:30]):
-                state = turn.get('p1_pokemon_state', {})
-                if isinstance(state, dict) and state.get('name') == name:
-                    last_state = state
-                    break
-            hp = last_state.get('hp_pct', 1.0) if last_state else 1.0
-            status = str(last_state.get('status', 'nostatus')) if last_state else 'nostatus'
-            if hp > 0 and 'fnt' not in status:
-                p1_alive.append(name.lower())
-                p1_hp_alive[name.lower()] = hp
-                p1_types.extend([t for t in poke.get('types', []) if t != 'notype'])
-
-        # Joueur 2
-        for turn in battle_timeline[:30]:
-            state = turn.get('p2_pokemon_state', {})
-            if isinstance(state, dict):
-                name = state.get('name')
-                hp = state.get('hp_pct', 1.0)
-                status = str(state.get('status', 'nostatus'))
-                if name and hp > 0 and 'fnt' not in status:
-                    p2_hp_alive[name.lower()] = hp
-                    if 'p2_lead_details' in battle and battle['p2_lead_details'].get('name') == name:
-                        p2_types.extend([t for t in battle['p2_lead_details'].get('types', []) if t != 'notype'])
-                    p2_alive.append(name.lower())
-
-        # features count
+        p1_alive, p2_alive, p1_hp_alive, p2_hp_alive, p1_types, p2_types = extract_survivors(battle)
+        survivors.append((p1_alive, p2_alive, p1_hp_alive, p2_hp_alive))
+
         features['p1_alive_count'] = len(set(p1_alive))
         features['p2_alive_count'] = len(set(p2_alive))
         features['alive_diff'] = features['p2_alive_count'] - features['p1_alive_count']
@@ -116,17 +93,8 @@ def create_simple_features(data: list[dict], type_lookup: dict) -> pd.DataFrame:
         features['p2_alive_type_score'] = type_resilience_score(p2_types)
         features['type_alive_diff'] = features['p2_alive_type_score'] - features['p1_alive_type_score']
 
-        # Key indicator : type_hp_match_score
-        matchup_sum, matchup_count = 0, 0
-        for p1_name in p1_alive:
-            p1_types_local = type_lookup.get(p1_name, [])
-            for p2_name in p2_alive:
-                p2_types_local = type_lookup.get(p2_name, [])
-                eff = get_effectiveness(p1_types_local, p2_types_local)
-                hp_weight = p1_hp_alive.get(p1_name, 1.0) - p2_hp_alive.get(p2_name, 1.0)
-                matchup_sum += eff * hp_weight
-                matchup_count += 1
-        features['type_hp_match_score'] = matchup_sum / matchup_count if matchup_count else 0
+        # type_hp_match_score, filled in below for all battles at once
+        features['type_hp_match_score'] = 0.0
 
         # ID and target
         features['battle_id'] = battle.get('battle_id')
@@ -135,9 +103,14 @@ def create_simple_features(data: list[dict], type_lookup: dict) -> pd.DataFrame:
 
         feature_list.append(features)
 
+    # Key indicator : type_hp_match_score (batched over all battles)
+    for features, score in zip(feature_list, type_hp_match_scores(survivors, type_lookup)):
+        features['type_hp_match_score'] = score
+
     df = pd.DataFrame(feature_list).fillna(0)
-    print(f"\n Feature extraction done for {len(df)} battles.")
-    display(df.head())
+    if verbose:
+        print(f"\n Feature extraction done for {len(df)} battles.")
+        display(df.head())
     return df
 
 
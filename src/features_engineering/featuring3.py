@@ -1,5 +1,6 @@
 from src.utils.get_type_chart import get_type_chart
-from src.utils.get_effectiveness import get_effectiveness
+from src.utils.extract_survivors import extract_survivors
+from src.utils.batch_type_hp_match_score import type_hp_match_scores
 from src.utils.type_resilience_score import type_resilience_score
 from src.utils.analyze_global_p2_usage import analyze_global_p2_usage
 import pandas as pd
@@ -8,7 +9,7 @@ from IPython.display import display
 from tqdm.notebook import tqdm # type: ignore
 
 
-def create_simple_features(data: list[dict], type_lookup: dict, all_p2_pokemons: set = None) -> pd.DataFrame:
+def create_simple_features(data: list[dict], type_lookup: dict, all_p2_pokemons: set = None, verbose: bool = True) -> pd.DataFrame:
     """
     Extracts features from Pokémon battle data.
     - Team stats
@@ -23,15 +24,18 @@ def create_simple_features(data: list[dict], type_lookup: dict, all_p2_pokemons:
         data: list of battle dictionaries
         type_lookup: dict mapping Pokémon name -> stats dict with keys 'base_hp', 'base_atk', etc.
         all_p2_pokemons: optional set of globally seen P2 Pokémon for fallback
+        verbose: if False, no progress bar, prints or preview (e.g. when scoring one battle at a time)
 
     Returns:
         DataFrame with features for each battle
     """
     feature_list = []
+    survivors = []
     type_chart = get_type_chart()
-    print("Building Pokémon type lookup table...")
+    if verbose:
+        print("Building Pokémon type lookup table...")
 
-    for battle in tqdm(data, desc="Extracting features"):
+    for battle in tqdm(data, desc="Extracting features", disable=not verbose):
         features = {}
         battle_timeline = battle.get('battle_timeline', [])
         if not battle_timeline:
@@ -102,37 +106,9 @@ def create_simple_features(data: list[dict], type_lookup: dict, all_p2_pokemons:
         features['p2_advantage_ratio'] = p2_adv_turns / 30
         features['tempo_balance'] = features['p1_advantage_ratio'] - features['p2_advantage_ratio']
 
-        # pokemon alive
-        p1_alive, p2_alive = [], []
-        p1_hp_alive, p2_hp_alive = {}, {}
-        p1_types, p2_types = [], []
-
-        for poke in p1_team:
-            name = poke.get('name')
-            last_state = None
-            for turn in reversed(battle_timeline[:30]):
-                state = turn.get('p1_pokemon_state', {})
-                if isinstance(state, dict) and state.get('name') == name:
-                    last_state = state
-                    break
-            hp = last_state.get('hp_pct', 1.0) if last_state else 1.0
-            status = str(last_state.get('status', 'nostatus')) if last_state else 'nostatus'
-            if hp > 0 and 'fnt' not in status:
-                p1_alive.append(name.lower())
-                p1_hp_alive[name.lower()] = hp
-                p1_types.extend([t for t in poke.get('types', []) if t != 'notype'])
-
-        for turn in battle_timeline[:30]:
-            state = turn.get('p2_pokemon_state', {})
-            if isinstance(state, dict):
-                name = state.get('name')
-                hp = state.get('hp_pct', 1.0)
-                status = str(state.get('status', 'nostatus'))
-                if name and hp > 0 and 'fnt' not in status:
-                    p2_hp_alive[name.lower()] = hp
-                    if 'p2_lead_details' in battle and battle['p2_lead_details'].get('name') == name:
-                        p2_types.extend([t for t in battle['p2_lead_details'].get('types', []) if t != 'notype'])
-                    p2_alive.append(name.lower())
+        # pokemon alive at the end of the 30 rounds
+        p1_alive, p2_alive, p1_hp_alive, p2_hp_alive, p1_types, p2_types = extract_survivors(battle)
+        survivors.append((p1_alive, p2_alive, p1_hp_alive, p2_hp_alive))
 
         features['p1_alive_count'] = len(set(p1_alive))
         features['p2_alive_count'] = len(set(p2_alive))
@@ -141,17 +117,8 @@ def create_simple_features(data: list[dict], type_lookup: dict, all_p2_pokemons:
         features['p2_alive_type_score'] = type_resilience_score(p2_types)
         features['type_alive_diff'] = features['p1_alive_type_score'] - features['p2_alive_type_score']
 
-        # type_hp_match_score
-        matchup_sum = matchup_count = 0
-        for p1_name in p1_alive:
-            p1_types_local = type_lookup.get(p1_name, [])
-            for p2_name in p2_alive:
-                p2_types_local = type_lookup.get(p2_name, [])
-                eff = get_effectiveness(p1_types_local, p2_types_local)
-                hp_weight = p1_hp_alive.get(p1_name, 1.0) - p2_hp_alive.get(p2_name, 1.0)
-                matchup_sum += eff * hp_weight
-                matchup_count += 1
-        features['type_hp_match_score'] = matchup_sum / matchup_count if matchup_count else 0
+        # type_hp_match_score, filled in below for all battles at once
+        features['type_hp_match_score'] = 0.0
 
         # ID and target
         features['battle_id'] = battle.get('battle_id')
@@ -160,8 +127,13 @@ def create_simple_features(data: list[dict], type_lookup: dict, all_p2_pokemons:
 
         feature_list.append(features)
 
+    # Key indicator : type_hp_match_score (batched over all battles)
+    for features, score in zip(feature_list, type_hp_match_scores(survivors, type_lookup)):
+        features['type_hp_match_score'] = score
+
     df = pd.DataFrame(feature_list).fillna(0)
-    print(f"\n Feature extraction done for {len(df)} battles.")
-    display(df.head())
+    if verbose:
+        print(f"\n Feature extraction done for {len(df)} battles.")
+        display(df.head())
     return df
 
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction import FeatureHasher
+from tqdm.notebook import tqdm # type: ignore
+
+
+def battle_events(battle: dict, n_turns: int = 30) -> tuple[list, list]:
+    """
+    Ordered events of the first n_turns rounds: switches, status changes and moves of both players.
+    Returns two parallel event lists, one with move names and one with move types.
+    """
+    by_name, by_type = [], []
+    last_name = {'p1': None, 'p2': None}
+    last_status = {'p1': 'nostatus', 'p2': 'nostatus'}
+
+    for turn in battle.get('battle_timeline', [])[:n_turns]:
+        for player in ('p1', 'p2'):
+            state = turn.get(f'{player}_pokemon_state', {})
+            if isinstance(state, dict):
+                name = str(state.get('name', '')).lower()
+                if name and name != last_name[player]:
+                    event = f'{player}:switch:{name}'
+                    by_name.append(event)
+                    by_type.append(event)
+                    last_name[player] = name
+                status = str(state.get('status', 'nostatus')).lower()
+                if status != last_status[player]:
+                    event = f'{player}:status:{status}'
+                    by_name.append(event)
+                    by_type.append(event)
+                    last_status[player] = status
+
+            move = turn.get(f'{player}_move_details')
+            if isinstance(move, dict):
+                by_name.append(f"{player}:move:{str(move.get('name', '')).lower()}")
+                by_type.append(f"{player}:mtype:{str(move.get('type', '')).lower()}")
+
+    return by_name, by_type
+
+
+def battle_ngrams(battle: dict, n_turns: int = 30, ngram_range: tuple = (1, 3)):
+    """Yields the n-gram tokens of a battle, for both the move-name and the move-type event sequences."""
+    for prefix, events in zip(('n', 't'), battle_events(battle, n_turns)):
+        for n in range(ngram_range[0], ngram_range[1] + 1):
+            for i in range(len(events) - n + 1):
+                yield f"{prefix}{n}|" + ' '.join(events[i:i + n])
+
+
+def create_sequence_features(data: list[dict], n_turns: int = 30, ngram_range: tuple = (1, 3),
+                             n_features: int = 2 ** 18, batch_size: int = 2000,
+                             skip_empty: bool = True) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Hashed n-gram counts of the move / switch / status sequence of each battle.
+    Battles are hashed batch by batch, so memory depends on n_features and the number
+    of non-zero counts, never on the size of the token vocabulary.
+
+    Args:
+        data: list of battle dictionaries
+        n_turns: number of rounds used per battle
+        ngram_range: (min_n, max_n) n-gram sizes
+        n_features: width of the hashed block
+        batch_size: number of battles hashed at once
+        skip_empty: drop battles without timeline, like featuring2/featuring3
+
+    Returns:
+        X_seq: CSR matrix (n_battles, n_features) of n-gram counts
+        battle_ids: array of battle IDs, one per row
+    """
+    hasher = FeatureHasher(n_features=n_features, input_type='string', alternate_sign=False)
+    blocks, battle_ids, batch = [], [], []
+
+    for battle in tqdm(data, desc="Hashing move sequences"):
+        if skip_empty and not battle.get('battle_timeline'):
+            continue
+        batch.append(battle)
+        battle_ids.append(battle.get('battle_id'))
+        if len(batch) == batch_size:
+            blocks.append(hasher.transform(battle_ngrams(b, n_turns, ngram_range) for b in batch))
+            batch = []
+    if batch:
+        blocks.append(hasher.transform(battle_ngrams(b, n_turns, ngram_range) for b in batch))
+
+    X_seq = sparse.vstack(blocks, format='csr') if blocks else sparse.csr_matrix((0, n_features))
+    print(f"Sequence block: {X_seq.shape[0]} battles x {n_features} hashed features, "
+          f"{X_seq.nnz} non-zeros ({X_seq.data.nbytes / 1e6:.1f} MB)")
+    return X_seq, np.asarray(battle_ids)
+
+
+def stack_with_dense(dense_df: pd.DataFrame, features: list, X_seq: sparse.csr_matrix,
+                     seq_battle_ids) -> sparse.csr_matrix:
+    """
+    Stacks the dense feature columns with the sequence block, row-aligned on battle_id.
+    Battles of dense_df missing from the sequence block get an empty sequence row.
+    Returns:
+        CSR matrix (len(dense_df), len(features) + n_features)
+    """
+    row_of = {bid: i for i, bid in enumerate(seq_battle_ids)}
+    empty_row = X_seq.shape[0]
+    rows = np.array([row_of.get(bid, empty_row) for bid in dense_df['battle_id']], dtype=np.int64)
+    X_seq = sparse.vstack([X_seq, sparse.csr_matrix((1, X_seq.shape[1]))], format='csr')
+
+    X_dense = sparse.csr_matrix(dense_df[features].to_numpy(dtype=float))
+    return sparse.hstack([X_dense, X_seq[rows]], format='csr')
@@ -12,6 +12,29 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import GridSearchCV
 
 
+# Hyperparameters choices of the logistic GridSearch
+LOGISTIC_PARAM_GRID = {
+    'logisticregression__C': [0.1, 0.5, 1, 2, 5],
+    'logisticregression__l1_ratio': [0.1, 0.3, 0.5, 0.7, 0.9],
+}
+
+
+def build_logistic_pipeline(C=1.0, l1_ratio=0.5, random_state=42):
+    """
+    Scaling + elastic-net logistic regression pipeline, unfitted.
+    """
+    return make_pipeline(
+        StandardScaler(),
+        LogisticRegression(
+            random_state=random_state,
+            solver='saga',
+            penalty='elasticnet',
+            C=C,
+            l1_ratio=l1_ratio,
+            max_iter=3000
+        )
+    )
+
 
 def train_logistic_model(train_df: pd.DataFrame, test_df: pd.DataFrame):
     """
@@ -24,26 +47,12 @@ def train_logistic_model(train_df: pd.DataFrame, test_df: pd.DataFrame):
     X_test = test_df[features]
 
     # Pipeline : scaling and logistic regression 
-    pipe = make_pipeline(
-        StandardScaler(),
-        LogisticRegression(
-            random_state=42,
-            solver='saga',
-            penalty='elasticnet',
-            max_iter=3000
-        )
-    )
-
-    # Hyperparameters choices
-    param_grid = {
-        'logisticregression__C': [0.1, 0.5, 1, 2, 5],
-        'logisticregression__l1_ratio': [0.1, 0.3, 0.5, 0.7, 0.9],
-    }
+    pipe = build_logistic_pipeline()
 
     # GridSearchCV 
     grid_search = GridSearchCV(
         pipe,
-        param_grid=param_grid,
+        param_grid=LOGISTIC_PARAM_GRID,
         cv=3,
         scoring='accuracy',
         n_jobs=-1,
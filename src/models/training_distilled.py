@@ -0,0 +1,178 @@
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from src.models.training1 import build_logistic_pipeline
+
+
+class DistilledClassifier:
+    """
+    Student model trained on the soft probabilities of a teacher.
+    Exposes predict / predict_proba like a scikit-learn classifier, so it can be
+    passed to create_submission or cross-checked against the teacher.
+    """
+
+    def __init__(self, model, kind):
+        self.model = model
+        self.kind = kind
+        self.classes_ = np.array([0, 1])
+
+    def predict_proba(self, X):
+        if self.kind == 'lgbm':
+            p1 = np.clip(self.model.predict(X), 0.0, 1.0)
+        else:
+            p1 = self.model.predict_proba(X)[:, 1]
+        return np.column_stack([1 - p1, p1])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(int)
+
+
+def make_synthetic_battles(X: pd.DataFrame, n_rows: int, swap_prob=0.3, noise=0.05, random_state=42) -> pd.DataFrame:
+    """
+    Creates synthetic feature rows around the real ones (MUNGE-style):
+    each synthetic row starts from a random real row, swaps each feature with the value
+    of another random row with probability swap_prob, then adds Gaussian noise scaled by the feature std.
+    """
+    rng = np.random.default_rng(random_state)
+    values = X.to_numpy(dtype=float)
+    base = values[rng.integers(0, len(values), n_rows)]
+    donors = values[rng.integers(0, len(values), n_rows)]
+    swap = rng.random(base.shape) < swap_prob
+    synthetic = np.where(swap, donors, base)
+    synthetic += rng.normal(size=synthetic.shape) * values.std(axis=0) * noise
+    return pd.DataFrame(synthetic, columns=X.columns)
+
+
+def train_student_model(X, soft_labels, student='lgbm', random_state=42, **student_params):
+    """
+    Fits a small student model on soft labels (teacher probabilities of the positive class).
+    - 'lgbm': shallow LightGBM with a cross-entropy objective on the probabilities
+    - 'logistic': elastic-net pipeline from build_logistic_pipeline, each row weighted
+      as a positive (weight p) and a negative (weight 1 - p)
+
+    Returns:
+        DistilledClassifier
+    """
+    soft_labels = np.asarray(soft_labels, dtype=float)
+    if student == 'lgbm':
+        params = dict(objective='cross_entropy', learning_rate=0.05, n_estimators=300,
+                      num_leaves=15, max_depth=4, subsample=0.8, subsample_freq=1,
+                      colsample_bytree=0.8, random_state=random_state, n_jobs=1, verbose=-1)
+        params.update(student_params)
+        model = lgb.LGBMRegressor(**params).fit(X, soft_labels)
+    elif student == 'logistic':
+        model = build_logistic_pipeline(random_state=random_state, **student_params)
+        X_dup = pd.concat([X, X], ignore_index=True)
+        y_dup = np.concatenate([np.ones(len(X), dtype=int), np.zeros(len(X), dtype=int)])
+        weights = np.concatenate([soft_labels, 1 - soft_labels])
+        model.fit(X_dup, y_dup, logisticregression__sample_weight=weights)
+    else:
+        raise ValueError(f"Unknown student '{student}' (expected 'lgbm' or 'logistic')")
+    return DistilledClassifier(model, student)
+
+
+def measure_latency(model, X, n_rows=200, batch_repeats=3):
+    """
+    Per-row latency (one predict_proba call per row, median in ms) and batch throughput (rows/s).
+    """
+    sample = X.iloc[:n_rows]
+    single = []
+    for i in range(len(sample)):
+        row = sample.iloc[[i]]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        single.append(time.perf_counter() - start)
+
+    batch = []
+    for _ in range(batch_repeats):
+        start = time.perf_counter()
+        model.predict_proba(X)
+        batch.append(time.perf_counter() - start)
+
+    return {
+        'latency_ms_p50': float(np.median(single) * 1000),
+        'latency_ms_p95': float(np.percentile(single, 95) * 1000),
+        'batch_rows_per_s': len(X) / min(batch),
+    }
+
+
+def distillation_report(teacher, students: dict, eval_df, features, n_latency_rows=200) -> pd.DataFrame:
+    """
+    Compares the teacher and the students on a labelled evaluation set.
+    Args:
+        teacher: fitted teacher model (e.g. the StackingClassifier)
+        students: dict name -> fitted student model
+        eval_df: labelled DataFrame not used for training
+        features: list of columns/features used
+    Returns:
+        DataFrame with accuracy, ROC-AUC, agreement with the teacher, size (MB) and latency
+    """
+    X_eval = eval_df[features]
+    y_eval = eval_df['player_won'].astype(int)
+    teacher_pred = teacher.predict(X_eval)
+
+    rows = []
+    for name, model in [('teacher', teacher)] + list(students.items()):
+        proba = model.predict_proba(X_eval)[:, 1]
+        pred = (proba >= 0.5).astype(int)
+        rows.append({
+            'model': name,
+            'accuracy': accuracy_score(y_eval, pred),
+            'roc_auc': roc_auc_score(y_eval, proba),
+            'agreement_with_teacher': float(np.mean(pred == teacher_pred)),
+            'size_mb': len(pickle.dumps(model)) / 1e6,
+            **measure_latency(model, X_eval, n_latency_rows),
+        })
+
+    report = pd.DataFrame(rows).set_index('model')
+    print("\nDistillation report:")
+    print(report.round(4).to_string())
+    return report
+
+
+def distill_stacked_model(teacher, features, train_df, eval_df, unlabeled_df=None, n_synthetic=None,
+                          students=('lgbm', 'logistic'), random_state=42):
+    """
+    Distills the stacked model into small student models.
+    The students are trained on the teacher's probabilities over the training battles,
+    the optional unlabeled battles (e.g. the test set features) and synthetic battles.
+
+    Args:
+        teacher: fitted model from train_stacked_model
+        features: list of columns/features used by the teacher
+        train_df: DataFrame of training battles
+        eval_df: labelled DataFrame used for the report (not used for training)
+        unlabeled_df: optional DataFrame of extra battles with the feature columns
+        n_synthetic: number of synthetic rows to add (default: as many as the real rows)
+        students: names of the students to train ('lgbm' and/or 'logistic')
+        random_state: int, for reproducibility
+
+    Returns:
+        students: dict name -> DistilledClassifier
+        report: DataFrame from distillation_report
+    """
+    X_transfer = train_df[features]
+    if unlabeled_df is not None:
+        X_transfer = pd.concat([X_transfer, unlabeled_df[features]], ignore_index=True)
+    n_synthetic = len(X_transfer) if n_synthetic is None else n_synthetic
+    if n_synthetic:
+        X_transfer = pd.concat([X_transfer, make_synthetic_battles(X_transfer, n_synthetic, random_state=random_state)],
+                               ignore_index=True)
+
+    print(f"Labelling {len(X_transfer)} transfer rows with the teacher...")
+    soft_labels = teacher.predict_proba(X_transfer)[:, 1]
+
+    fitted = {}
+    for student in students:
+        print(f"Training '{student}' student...")
+        start = time.perf_counter()
+        fitted[f"student_{student}"] = train_student_model(X_transfer, soft_labels, student, random_state)
+        print(f"Done in {time.perf_counter() - start:.1f}s")
+
+    report = distillation_report(teacher, fitted, eval_df, features)
+    return fitted, report
@@ -0,0 +1,263 @@
+import copy
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from src.models.training_stacked import train_stacked_model
+
+
+def continue_base_learner(name, estimator, X, y, n_new_trees=200, n_new_rf_trees=50):
+    """
+    Continues training a fitted base learner on new data, without touching the original.
+    - lgbm: new trees boosted on top of the saved booster (init_model)
+    - xgb: new trees boosted on top of the saved booster (xgb_model)
+    - rf: new trees added with warm_start, fitted on the new data only
+    - anything else: refitted from scratch on the new data
+
+    Returns:
+        updated estimator
+    """
+    if name == 'lgbm':
+        updated = clone(estimator).set_params(n_estimators=n_new_trees)
+        updated.fit(X, y, init_model=estimator.booster_)
+    elif name == 'xgb':
+        updated = clone(estimator).set_params(n_estimators=n_new_trees)
+        updated.fit(X, y, xgb_model=estimator.get_booster())
+    elif name == 'rf':
+        updated = copy.deepcopy(estimator)
+        updated.set_params(warm_start=True, n_estimators=len(estimator.estimators_) + n_new_rf_trees)
+        updated.fit(X, y)
+    else:
+        updated = clone(estimator).fit(X, y)
+    return updated
+
+
+def stacked_meta_rows(stack_model, features, df, n_splits=5, random_state=42) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Meta model inputs of a stacked model on df, as StackingClassifier builds them:
+    out-of-fold predictions of clones of its base learners (+ the raw features with passthrough).
+    Returns:
+        X_meta: array (n_rows, n_learners [+ n_features])
+        y: array of labels
+    """
+    X = df[features]
+    y = df['player_won'].astype(int).to_numpy()
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    oof = np.column_stack([
+        cross_val_predict(clone(est), X, y, cv=cv, method='predict_proba')[:, 1]
+        for est in stack_model.estimators_
+    ])
+    X_meta = np.hstack([oof, X.to_numpy()]) if stack_model.passthrough else oof
+    return X_meta, y
+
+
+def update_stacked_model(stack_model, features, new_df, n_new_trees=200, n_new_rf_trees=50,
+                         n_splits=5, random_state=42, base_df=None):
+    """
+    Incrementally updates a stacked model (from train_stacked_model) with a new batch of battles.
+    Base learners continue from their fitted state, the meta model is refitted on the meta rows
+    of the earlier data plus the out-of-fold predictions of the continued learners on the new batch.
+    The earlier meta rows come from stack_model.meta_rows_ (set by a previous update) or,
+    for a model fresh from train_stacked_model, are computed once on base_df (see stacked_meta_rows;
+    this costs n_splits fits of the base learners on base_df, later updates reuse the saved rows).
+    Without either, the meta model is refitted on the new batch only, so a small batch replaces
+    a meta model fitted on the whole train set.
+
+    Args:
+        stack_model: fitted StackingClassifier
+        features: list of columns/features used by stack_model
+        new_df: DataFrame of new battles with the feature columns and 'player_won'
+        n_new_trees: number of boosting rounds added to LGBM and XGB
+        n_new_rf_trees: number of trees added to the Random Forest
+        n_splits: number of folds for the out-of-fold meta features
+        random_state: int, for reproducibility
+        base_df: optional DataFrame stack_model was trained on, used when it has no meta_rows_
+
+    Returns:
+        updated_model: new StackingClassifier (stack_model is left unchanged),
+                       with the meta rows of all the data seen so far in meta_rows_
+    """
+    X = new_df[features]
+    y = new_df['player_won'].astype(int)
+    names = [name for name, _ in stack_model.named_estimators_.items()]
+    print(f"Updating stacked model on {len(X)} new battles ({', '.join(names)})...")
+
+    # Out-of-fold predictions of the continued base learners
+    oof = np.zeros((len(X), len(names)))
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for train_idx, val_idx in cv.split(X, y):
+        for k, (name, est) in enumerate(zip(names, stack_model.estimators_)):
+            fold_model = continue_base_learner(name, est, X.iloc[train_idx], y.iloc[train_idx],
+                                               n_new_trees, n_new_rf_trees)
+            oof[val_idx, k] = fold_model.predict_proba(X.iloc[val_idx])[:, 1]
+
+    # Base learners continued on the whole batch
+    updated_estimators = [
+        continue_base_learner(name, est, X, y, n_new_trees, n_new_rf_trees)
+        for name, est in zip(names, stack_model.estimators_)
+    ]
+
+    # Meta model refitted on the earlier meta rows + the updated out-of-fold predictions
+    X_meta = np.hstack([oof, X.to_numpy()]) if stack_model.passthrough else oof
+    y_meta = y.to_numpy()
+    base_meta = getattr(stack_model, 'meta_rows_', None)
+    if base_meta is None and base_df is not None:
+        print(f"Computing meta rows of the {len(base_df)} base battles...")
+        base_meta = stacked_meta_rows(stack_model, features, base_df, n_splits, random_state)
+    if base_meta is not None:
+        X_meta = np.vstack([base_meta[0], X_meta])
+        y_meta = np.concatenate([base_meta[1], y_meta])
+    else:
+        print("No earlier meta rows (pass base_df): the meta model is refitted on the new batch only.")
+    meta_model = clone(stack_model.final_estimator_).fit(X_meta, y_meta)
+
+    updated_model = copy.deepcopy(stack_model)
+    updated_model.estimators_ = updated_estimators
+    for name, est in zip(names, updated_estimators):
+        updated_model.named_estimators_[name] = est
+    updated_model.final_estimator_ = meta_model
+    updated_model.meta_rows_ = (X_meta, y_meta)
+    print(f"Incremental update done (meta model fitted on {len(y_meta)} rows).")
+    return updated_model
+
+
+def save_model_version(model, features, model_dir='models', name='stacked', metadata=None):
+    """
+    Saves a model under the next version number: {model_dir}/{name}_v{version}.joblib,
+    with a JSON file next to it (version, parent, date, features and metadata).
+    Returns:
+        version: int, the version number written
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    versions = list_model_versions(model_dir, name)
+    version = versions['version'].max() + 1 if len(versions) else 1
+    path = os.path.join(model_dir, f"{name}_v{version:03d}")
+
+    joblib.dump({'model': model, 'features': features}, path + '.joblib')
+    info = {
+        'name': name,
+        'version': int(version),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'features': list(features),
+        **(metadata or {}),
+    }
+    with open(path + '.json', 'w') as f:
+        json.dump(info, f, indent=2, default=str)
+    print(f"Model saved as '{path}.joblib' (version {version}).")
+    return int(version)
+
+
+def list_model_versions(model_dir='models', name='stacked') -> pd.DataFrame:
+    """Lists the saved versions of a model with their metadata, oldest first."""
+    rows = []
+    for meta_path in glob.glob(os.path.join(model_dir, f"{name}_v*.json")):
+        with open(meta_path) as f:
+            info = json.load(f)
+        info.pop('features', None)
+        rows.append(info)
+    if not rows:
+        return pd.DataFrame(columns=['name', 'version', 'created_at'])
+    return pd.DataFrame(rows).sort_values('version').reset_index(drop=True)
+
+
+def load_model_version(model_dir='models', name='stacked', version=None):
+    """
+    Loads a saved model version (the latest one if version is None).
+    Returns:
+        model, features, version
+    """
+    versions = list_model_versions(model_dir, name)
+    if not len(versions):
+        raise FileNotFoundError(f"No saved version of '{name}' in '{model_dir}'")
+    version = int(versions['version'].max()) if version is None else int(version)
+    saved = joblib.load(os.path.join(model_dir, f"{name}_v{version:03d}.joblib"))
+    return saved['model'], saved['features'], version
+
+
+def incremental_update(new_df, model_dir='models', name='stacked', base_df=None, **update_kwargs):
+    """
+    Loads the latest saved version, updates it on new_df and saves the result as a new version.
+    base_df (the data of the saved version) is only needed for the first update of a model
+    from train_stacked_model; later versions carry their meta rows (see update_stacked_model).
+    Returns:
+        updated_model, features, version
+    """
+    model, features, parent = load_model_version(model_dir, name)
+    start = time.perf_counter()
+    updated_model = update_stacked_model(model, features, new_df, base_df=base_df, **update_kwargs)
+    elapsed = time.perf_counter() - start
+    version = save_model_version(updated_model, features, model_dir, name, metadata={
+        'parent_version': parent,
+        'mode': 'incremental',
+        'n_new_rows': len(new_df),
+        'n_meta_rows': len(updated_model.meta_rows_[1]),
+        'train_time_s': round(elapsed, 2),
+        **{f"param_{k}": v for k, v in update_kwargs.items()},
+    })
+    return updated_model, features, version
+
+
+def compare_incremental_vs_full(base_df, new_df, eval_df, base_model=None, random_state=42, **update_kwargs):
+    """
+    Compares an incremental update against a full retrain on base_df + new_df.
+    The incremental meta model is refitted on the meta rows of base_df and new_df, like the full retrain.
+    Both models are scored on eval_df (labelled battles not used for training).
+
+    Args:
+        base_df: DataFrame the current model was trained on
+        new_df: DataFrame of the new batch of battles
+        eval_df: labelled DataFrame used for the comparison
+        base_model: optional (model, features) already trained on base_df; trained here if None
+        random_state: int, for reproducibility
+        update_kwargs: passed to update_stacked_model
+
+    Returns:
+        DataFrame with accuracy, ROC-AUC and training time of both approaches
+    """
+    if base_model is None:
+        print("Training base model on base_df...")
+        base_model = train_stacked_model(base_df, eval_df, display_cm=False, random_state=random_state)
+    model, features = base_model
+
+    start = time.perf_counter()
+    incremental_model = update_stacked_model(model, features, new_df, random_state=random_state,
+                                             base_df=base_df, **update_kwargs)
+    incremental_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full_model, _ = train_stacked_model(
+        pd.concat([base_df, new_df], ignore_index=True), eval_df,
+        display_cm=False, random_state=random_state
+    )
+    full_time = time.perf_counter() - start
+
+    X_eval = eval_df[features]
+    y_eval = eval_df['player_won'].astype(int)
+    rows = []
+    for label, m, t in [('base (no update)', model, 0.0),
+                        ('incremental', incremental_model, incremental_time),
+                        ('full retrain', full_model, full_time)]:
+        proba = m.predict_proba(X_eval)[:, 1]
+        rows.append({
+            'model': label,
+            'accuracy': accuracy_score(y_eval, (proba >= 0.5).astype(int)),
+            'roc_auc': roc_auc_score(y_eval, proba),
+            'train_time_s': t,
+        })
+
+    comparison = pd.DataFrame(rows).set_index('model')
+    print("\nIncremental update vs full retrain:")
+    print(comparison.round(4))
+    print(f"Accuracy gap (full - incremental): "
+          f"{comparison.loc['full retrain', 'accuracy'] - comparison.loc['incremental', 'accuracy']:+.4f} | "
+          f"Speedup: x{full_time / incremental_time:.1f}")
+    return comparison
@@ -0,0 +1,67 @@
+import numpy as np
+from scipy import sparse
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+
+from src.models.training1 import LOGISTIC_PARAM_GRID, build_logistic_pipeline
+from src.models.training_stacked import build_base_learners
+
+
+def train_sparse_logistic_model(X, y, param_grid=None, random_state=42):
+    """
+    Elastic-net logistic regression with GridSearch on a sparse matrix (dense features + sequence block).
+    Scaling is done without centering so X stays sparse.
+
+    Args:
+        X: CSR matrix, e.g. from stack_with_dense
+        y: labels ('player_won')
+        param_grid: GridSearch grid (default: the grid of train_logistic_model)
+        random_state: int, for reproducibility
+
+    Returns:
+        best_model: fitted pipeline
+    """
+    if not sparse.issparse(X):
+        raise TypeError("X must be a scipy.sparse matrix")
+    pipe = build_logistic_pipeline(random_state=random_state).set_params(standardscaler__with_mean=False)
+    param_grid = param_grid or LOGISTIC_PARAM_GRID
+    grid_search = GridSearchCV(pipe, param_grid=param_grid, cv=3, scoring='accuracy', n_jobs=-1, verbose=1)
+
+    print("Running Grid Search (sparse Logistic Regression)...")
+    grid_search.fit(X, y)
+    print(f"Best Parameters: {grid_search.best_params_}")
+    print(f"Best Cross-Validation Accuracy: {grid_search.best_score_:.4f}")
+    return grid_search.best_estimator_
+
+
+def train_sparse_lgbm_model(X, y, random_state=42, **lgbm_params):
+    """
+    LGBM learner of the stacked model trained directly on a sparse matrix, with a validation split.
+
+    Args:
+        X: CSR matrix, e.g. from stack_with_dense
+        y: labels ('player_won')
+        random_state: int, for reproducibility
+        lgbm_params: overrides of the stacked LGBM parameters
+
+    Returns:
+        model: fitted LGBMClassifier
+    """
+    if not sparse.issparse(X):
+        raise TypeError("X must be a scipy.sparse matrix")
+    y = np.asarray(y).astype(int)
+    X = X.astype(np.float32)
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=random_state, stratify=y
+    )
+    print(f"Train size: {X_train.shape[0]}, Validation size: {X_val.shape[0]}, Features: {X.shape[1]}")
+
+    model = dict(build_base_learners(random_state))['lgbm']
+    model.set_params(**lgbm_params)
+    model.fit(X_train, y_train)
+
+    y_proba = model.predict_proba(X_val)[:, 1]
+    y_pred = (y_proba >= 0.5).astype(int)
+    print(f"Accuracy: {accuracy_score(y_val, y_pred):.4f} | F1: {f1_score(y_val, y_pred):.4f} | "
+          f"ROC-AUC: {roc_auc_score(y_val, y_proba):.4f}")
+    return model
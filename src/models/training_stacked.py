@@ -4,7 +4,7 @@ import lightgbm as lgb
 from xgboost import XGBClassifier
 from sklearn.ensemble import RandomForestClassifier, StackingClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, StratifiedGroupKFold
 from sklearn.metrics import (
     accuracy_score, f1_score, roc_auc_score,
     confusion_matrix, classification_report
@@ -12,7 +12,40 @@ from sklearn.metrics import (
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def train_stacked_model(train_df, test_df, display_cm=True, random_state=42):
+from src.utils.deduplicate_battles import group_train_test_split
+
+
+def build_base_learners(random_state=42):
+    """
+    Base learners of the stacked model (LGBM, XGB, RF), unfitted.
+    Returns:
+        list of (name, estimator) tuples, as expected by StackingClassifier
+    """
+    return [
+        ('lgbm', lgb.LGBMClassifier(
+            objective='binary', learning_rate=0.03, n_estimators=2000,
+            num_leaves=63, subsample=0.8, colsample_bytree=0.8,
+            random_state=random_state, n_jobs=-1
+        )),
+        ('xgb', XGBClassifier(
+            eval_metric='logloss', learning_rate=0.05, max_depth=6,
+            n_estimators=1500, subsample=0.8, colsample_bytree=0.8,
+            random_state=random_state, use_label_encoder=False
+        )),
+        ('rf', RandomForestClassifier(
+            n_estimators=300, max_depth=8, n_jobs=-1, random_state=random_state
+        ))
+    ]
+
+
+def build_meta_model(random_state=42):
+    """Logistic Regression meta model of the stacked model, unfitted."""
+    return LogisticRegression(
+        solver='lbfgs', max_iter=4000, random_state=random_state
+    )
+
+
+def train_stacked_model(train_df, test_df, display_cm=True, random_state=42, groups=None):
     """
     Trains a stacked model using LGBM, XGB, and RF with Logistic Regression.
     Returns the trained model and the features used.
@@ -22,6 +55,8 @@ def train_stacked_model(train_df, test_df, display_cm=True, random_state=42):
         test_df: DataFrame with the same feature columns
         display_cm: bool, if True, displays the confusion matrix
         random_state: int, for reproducibility
+        groups: optional duplicate group of each row of train_df (see battle_groups);
+                a group never ends up on both sides of the validation split or of the stacking folds
 
     Returns:
         stack_model: trained model (StackingClassifier)
@@ -34,37 +69,27 @@ def train_stacked_model(train_df, test_df, display_cm=True, random_state=42):
     X_test = test_df[features]
 
     # Train / Validation split
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=random_state, stratify=y
-    )
+    if groups is None:
+        X_train, X_val, y_train, y_val = train_test_split(
+            X, y, test_size=0.2, random_state=random_state, stratify=y
+        )
+        stack_cv = None
+    else:
+        X_train, X_val, y_train, y_val, groups_train = group_train_test_split(
+            X, y, groups, test_size=0.2, random_state=random_state
+        )
+        stack_cv = list(StratifiedGroupKFold(n_splits=5, shuffle=True, random_state=random_state)
+                        .split(X_train, y_train, groups_train))
     print(f"Train size: {len(X_train)}, Validation size: {len(X_val)}")
 
-    # Base learners 
-    base_learners = [
-        ('lgbm', lgb.LGBMClassifier(
-            objective='binary', learning_rate=0.03, n_estimators=2000,
-            num_leaves=63, subsample=0.8, colsample_bytree=0.8,
-            random_state=random_state, n_jobs=-1
-        )),
-        ('xgb', XGBClassifier(
-            eval_metric='logloss', learning_rate=0.05, max_depth=6,
-            n_estimators=1500, subsample=0.8, colsample_bytree=0.8,
-            random_state=random_state, use_label_encoder=False
-        )),
-        ('rf', RandomForestClassifier(
-            n_estimators=300, max_depth=8, n_jobs=-1, random_state=random_state
-        ))
-    ]
-
-    # Meta model
-    meta_model = LogisticRegression(
-        solver='lbfgs', max_iter=4000, random_state=random_state
-    )
+    # Base learners and meta model
+    base_learners = build_base_learners(random_state)
+    meta_model = build_meta_model(random_state)
 
     # Stacking 
     stack_model = StackingClassifier(
         estimators=base_learners, final_estimator=meta_model,
-        stack_method='predict_proba', passthrough=True, n_jobs=-1
+        stack_method='predict_proba', passthrough=True, cv=stack_cv, n_jobs=-1
     )
 
     # Training 
@@ -0,0 +1,252 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from datetime import datetime
+
+import joblib
+import pandas as pd
+
+
+class ArtifactCache:
+    """
+    Content-addressed store for pipeline outputs.
+    Each artifact is saved as {root}/{key}.joblib with a {root}/{key}.json metadata file.
+    """
+
+    def __init__(self, root='.artifacts'):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, f"{key}.{ext}")
+
+    def has(self, key):
+        return os.path.exists(self._path(key, 'joblib'))
+
+    def load(self, key):
+        value = joblib.load(self._path(key, 'joblib'))
+        self._touch(key)
+        return value
+
+    def save(self, key, value, stage, seconds):
+        joblib.dump(value, self._path(key, 'joblib'))
+        now = datetime.now().isoformat(timespec='seconds')
+        meta = {'key': key, 'stage': stage, 'seconds': round(seconds, 3), 'created_at': now, 'last_used': now}
+        with open(self._path(key, 'json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def _touch(self, key):
+        meta_path = self._path(key, 'json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            meta['last_used'] = datetime.now().isoformat(timespec='seconds')
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f, indent=2)
+
+    def list_artifacts(self) -> pd.DataFrame:
+        """Lists stored artifacts (key, stage, size, creation and last use), most recently used first."""
+        rows = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.json'):
+                continue
+            with open(os.path.join(self.root, name)) as f:
+                meta = json.load(f)
+            data_path = self._path(meta['key'], 'joblib')
+            meta['size_mb'] = os.path.getsize(data_path) / 1e6 if os.path.exists(data_path) else 0.0
+            rows.append(meta)
+        if not rows:
+            return pd.DataFrame(columns=['key', 'stage', 'seconds', 'created_at', 'last_used', 'size_mb'])
+        return pd.DataFrame(rows).sort_values('last_used', ascending=False).reset_index(drop=True)
+
+    def gc(self, keep_keys=None, max_age_days=None) -> pd.DataFrame:
+        """
+        Deletes artifacts that are not in keep_keys and/or were last used more than max_age_days ago.
+        Returns:
+            DataFrame of the deleted artifacts
+        """
+        if keep_keys is None and max_age_days is None:
+            raise ValueError("gc needs keep_keys and/or max_age_days")
+        artifacts = self.list_artifacts()
+        to_delete = pd.Series(True, index=artifacts.index)
+        if keep_keys is not None:
+            to_delete &= ~artifacts['key'].isin(set(keep_keys))
+        if max_age_days is not None:
+            age = datetime.now() - pd.to_datetime(artifacts['last_used'])
+            to_delete &= age > pd.Timedelta(days=max_age_days)
+
+        deleted = artifacts[to_delete]
+        for key in deleted['key']:
+            for ext in ('joblib', 'json'):
+                if os.path.exists(self._path(key, ext)):
+                    os.remove(self._path(key, ext))
+        print(f"Removed {len(deleted)} artifacts ({deleted['size_mb'].sum():.1f} MB freed).")
+        return deleted
+
+
+class Stage:
+    """
+    One step of the pipeline: func(*inputs, **params) -> output.
+    inputs are names of sources or of upstream stages.
+    The code version is the source of func plus the source of the modules of the callables in code
+    and of every src.* module they import (transitively), so editing e.g. featuring3.py or one of its
+    src.utils helpers invalidates the stages that use it. version can be bumped by hand.
+    Stages with side effects (e.g. writing a CSV) should use cache_output=False so they always run.
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, code=(), version=None, cache_output=True):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = params or {}
+        self.code = list(code)
+        self.version = version
+        self.cache_output = cache_output
+
+    def code_hash(self):
+        modules = {}
+        for c in self.code:
+            _collect_src_modules(inspect.getmodule(c), modules)
+        sources = [inspect.getsource(self.func)]
+        sources += [inspect.getsource(modules[name]) for name in sorted(modules)]
+        sources.append(str(self.version))
+        return hashlib.sha256('\n'.join(sources).encode()).hexdigest()
+
+    def key(self, input_keys):
+        return joblib.hash({
+            'stage': self.name,
+            'code': self.code_hash(),
+            'params': self.params,
+            'inputs': input_keys,
+        })
+
+
+def _collect_src_modules(module, modules):
+    """Adds module and the src.* modules it imports (directly or through imported names) to modules."""
+    if module is None or module.__name__ in modules or not module.__name__.startswith('src.'):
+        return
+    modules[module.__name__] = module
+    for obj in vars(module).values():
+        _collect_src_modules(obj if inspect.ismodule(obj) else inspect.getmodule(obj), modules)
+
+
+def hash_source(value):
+    """Hash of a pipeline source: path, size and mtime for existing files, content hash otherwise."""
+    if isinstance(value, str) and os.path.isfile(value):
+        stat = os.stat(value)
+        return joblib.hash((os.path.abspath(value), stat.st_size, stat.st_mtime_ns))
+    return joblib.hash(value)
+
+
+def run_pipeline(stages: list, sources: dict, cache: ArtifactCache, targets=None, force=()):
+    """
+    Runs the stages in dependency order, skipping the ones whose output is already in the cache.
+    A stage that hits the cache is not even loaded unless a downstream stage has to run.
+
+    Args:
+        stages: list of Stage
+        sources: dict name -> raw input (e.g. train_data, test_data or file paths)
+        cache: ArtifactCache
+        targets: names of the stages whose outputs are returned (default: all stages without dependents)
+        force: names of stages to re-run even if cached
+
+    Returns:
+        outputs: dict stage name -> output, for the targets
+        summary: DataFrame with status (run / hit / skipped), seconds and key per stage
+    """
+    by_name = {stage.name: stage for stage in stages}
+    keys = {name: hash_source(value) for name, value in sources.items()}
+
+    def stage_key(name):
+        if name not in keys:
+            stage = by_name[name]
+            keys[name] = stage.key([stage_key(i) for i in stage.inputs])
+        return keys[name]
+
+    for stage in stages:
+        stage_key(stage.name)
+
+    if targets is None:
+        used = {i for stage in stages for i in stage.inputs}
+        targets = [stage.name for stage in stages if stage.name not in used]
+
+    values = dict(sources)
+    status = {stage.name: ('skipped', 0.0) for stage in stages}
+
+    def get_value(name):
+        if name in values:
+            return values[name]
+        stage = by_name[name]
+        key = keys[name]
+        start = time.perf_counter()
+        if stage.cache_output and cache.has(key) and name not in force:
+            values[name] = cache.load(key)
+            status[name] = ('hit', time.perf_counter() - start)
+        else:
+            args = [get_value(i) for i in stage.inputs]
+            start = time.perf_counter()
+            values[name] = stage.func(*args, **stage.params)
+            elapsed = time.perf_counter() - start
+            if stage.cache_output:
+                cache.save(key, values[name], name, elapsed)
+            status[name] = ('run', elapsed)
+        return values[name]
+
+    outputs = {name: get_value(name) for name in targets}
+
+    summary = pd.DataFrame([
+        {'stage': s.name, 'status': status[s.name][0], 'seconds': round(status[s.name][1], 3), 'key': keys[s.name]}
+        for s in stages
+    ])
+    n_cached = (summary['status'] != 'run').sum()
+    print("\nPipeline summary:")
+    print(summary.drop(columns='key').to_string(index=False))
+    print(f"Cache hits: {n_cached}/{len(summary)} stages | total run time: {summary['seconds'].sum():.1f}s")
+    return outputs, summary
+
+
+# Default stages: load -> lookup/usage -> features -> train -> submit
+
+def _p2_usage(data):
+    from src.utils.analyze_global_p2_usage import analyze_global_p2_usage
+    return analyze_global_p2_usage(data)[1]
+
+
+def _features(data, type_lookup, all_p2_pokemons):
+    from src.features_engineering.featuring3 import create_simple_features
+    return create_simple_features(data, type_lookup, all_p2_pokemons)
+
+
+def _train(train_df, test_df, random_state):
+    from src.models.training_stacked import train_stacked_model
+    return train_stacked_model(train_df, test_df, display_cm=False, random_state=random_state)
+
+
+def _submit(model_and_features, test_df, output_path):
+    from src.submission.submission1 import create_submission
+    model, features = model_and_features
+    return create_submission(model, test_df, features, output_path=output_path)
+
+
+def build_default_pipeline(output_path='submission.csv', random_state=42) -> list:
+    """
+    Stages of the end-to-end run, expecting sources 'train_data' and 'test_data' (lists of battles).
+    """
+    from src.utils.build_type_lookup import build_type_lookup
+    from src.utils.analyze_global_p2_usage import analyze_global_p2_usage
+    from src.features_engineering.featuring3 import create_simple_features
+    from src.models.training_stacked import train_stacked_model
+    from src.submission.submission1 import create_submission
+
+    return [
+        Stage('type_lookup', build_type_lookup, ['train_data'], code=[build_type_lookup]),
+        Stage('p2_usage', _p2_usage, ['train_data'], code=[analyze_global_p2_usage]),
+        Stage('train_features', _features, ['train_data', 'type_lookup', 'p2_usage'], code=[create_simple_features]),
+        Stage('test_features', _features, ['test_data', 'type_lookup', 'p2_usage'], code=[create_simple_features]),
+        Stage('model', _train, ['train_features', 'test_features'],
+              params={'random_state': random_state}, code=[train_stacked_model]),
+        Stage('submission', _submit, ['model', 'test_features'],
+              params={'output_path': output_path}, code=[create_submission], cache_output=False),
+    ]
@@ -0,0 +1,202 @@
+import glob
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.utils.load_battles import parse_shard
+
+_DONE = object()
+
+
+class StageStats:
+    """Busy time, time blocked waiting for input, time blocked on a full output queue, items processed."""
+
+    def __init__(self, name, n_workers=1):
+        self.name = name
+        self.n_workers = n_workers
+        self.busy = self.wait_in = self.blocked_out = 0.0
+        self.items = 0
+
+    def as_row(self, wall):
+        return {
+            'stage': self.name,
+            'workers': self.n_workers,
+            'items': self.items,
+            'busy_s': round(self.busy, 3),
+            'wait_input_s': round(self.wait_in, 3),
+            'blocked_output_s': round(self.blocked_out, 3),
+            'utilization': round(self.busy / (wall * self.n_workers), 3) if wall else 0.0,
+        }
+
+
+def _timed_put(q, item, stats):
+    start = time.perf_counter()
+    q.put(item)
+    stats.blocked_out += time.perf_counter() - start
+
+
+def _timed_get(q, stats):
+    start = time.perf_counter()
+    item = q.get()
+    stats.wait_in += time.perf_counter() - start
+    return item
+
+
+# Featurization worker processes: the feature function and its arguments are sent once per process
+
+_worker_features = None
+
+
+def _init_worker(create_features, feature_kwargs):
+    global _worker_features
+    _worker_features = (create_features, feature_kwargs)
+
+
+def _featurize_chunk(chunk):
+    create_features, feature_kwargs = _worker_features
+    start = time.perf_counter()
+    df = create_features(chunk, verbose=False, **feature_kwargs)
+    return df, time.perf_counter() - start
+
+
+def run_pipelined(sources, create_features, final_step=None, chunk_size=500, n_workers=None,
+                  queue_size=4, backend='auto', **feature_kwargs):
+    """
+    Loads, featurizes and assembles battles with overlapping stages and bounded queues:
+    reader thread (parse shards, cut chunks) -> featurization processes -> assembly -> final_step.
+    Full queues block the upstream stage, so at most about queue_size + n_workers chunks are in memory.
+
+    Args:
+        sources: glob pattern or list of shard paths (see load_battle_shards), or a list of battles
+        create_features: create_simple_features of featuring1, featuring2 or featuring3
+        final_step: optional callable(feature_df), e.g. training or submission
+        chunk_size: number of battles per featurization chunk
+        n_workers: number of featurization processes (default: number of CPUs)
+        queue_size: capacity of the queues between stages (in chunks)
+        backend: JSON backend used to parse the shards
+        feature_kwargs: extra arguments of create_features (type_lookup, all_p2_pokemons...)
+
+    Returns:
+        feature_df: DataFrame of features
+        result: output of final_step (None without final_step)
+        report: DataFrame with busy / wait / blocked times and utilization of the pipelined stages
+                (final_step runs after them and is timed separately)
+    """
+    if isinstance(sources, str):
+        sources = sorted(glob.glob(sources))
+    in_memory = bool(sources) and isinstance(sources[0], dict)
+    n_workers = n_workers or os.cpu_count() or 1
+
+    read_stats = StageStats('read + parse')
+    dispatch_stats = StageStats('dispatch')
+    feature_stats = StageStats('featurize', n_workers)
+    assemble_stats = StageStats('assemble')
+    chunks_q = queue.Queue(maxsize=queue_size)
+    futures_q = queue.Queue(maxsize=queue_size + n_workers)
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        try:
+            if in_memory:
+                shards = [sources]
+            else:
+                shards = iter(sources)
+            for shard in shards:
+                if stop.is_set():
+                    break
+                start = time.perf_counter()
+                records = shard if in_memory else parse_shard(shard, backend)[0]
+                read_stats.busy += time.perf_counter() - start
+                read_stats.items += 1
+                for i in range(0, len(records), chunk_size):
+                    if stop.is_set():
+                        break
+                    _timed_put(chunks_q, records[i:i + chunk_size], read_stats)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            chunks_q.put(_DONE)
+
+    def dispatcher(pool):
+        try:
+            while True:
+                chunk = _timed_get(chunks_q, dispatch_stats)
+                if chunk is _DONE:
+                    break
+                if stop.is_set():
+                    # drop the chunk, keep reading until the reader is done
+                    continue
+                start = time.perf_counter()
+                future = pool.submit(_featurize_chunk, chunk)
+                dispatch_stats.busy += time.perf_counter() - start
+                dispatch_stats.items += 1
+                _timed_put(futures_q, future, dispatch_stats)
+        except Exception as e:
+            errors.append(e)
+            # unblock the reader
+            while chunks_q.get() is not _DONE:
+                pass
+        finally:
+            futures_q.put(_DONE)
+
+    print(f"Pipelined run: chunks of {chunk_size} battles, {n_workers} featurization workers, queue size {queue_size}")
+    t0 = time.perf_counter()
+    frames = []
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(create_features, feature_kwargs)) as pool:
+        threads = [threading.Thread(target=reader, daemon=True),
+                   threading.Thread(target=dispatcher, args=(pool,), daemon=True)]
+        for t in threads:
+            t.start()
+
+        finished = False
+        try:
+            while True:
+                future = _timed_get(futures_q, assemble_stats)
+                if future is _DONE:
+                    finished = True
+                    break
+                start = time.perf_counter()
+                df, busy = future.result()
+                assemble_stats.wait_in += time.perf_counter() - start
+                feature_stats.busy += busy
+                feature_stats.items += 1
+                start = time.perf_counter()
+                frames.append(df)
+                assemble_stats.busy += time.perf_counter() - start
+                assemble_stats.items += 1
+        finally:
+            if not finished:
+                # e.g. a featurization error: stop the reader and dispatcher, drop what is queued
+                stop.set()
+                future = futures_q.get()
+                while future is not _DONE:
+                    future.cancel()
+                    future = futures_q.get()
+            for t in threads:
+                t.join()
+    if errors:
+        raise errors[0]
+
+    start = time.perf_counter()
+    feature_df = pd.concat(frames, ignore_index=True).fillna(0) if frames else pd.DataFrame()
+    assemble_stats.busy += time.perf_counter() - start
+    wall = time.perf_counter() - t0
+
+    report = pd.DataFrame([s.as_row(wall) for s in (read_stats, dispatch_stats, feature_stats, assemble_stats)])
+    bottleneck = report.sort_values('utilization', ascending=False)['stage'].iloc[0]
+    print(f"\nFeatures for {len(feature_df)} battles in {wall:.1f}s")
+    print(report.to_string(index=False))
+    print(f"Most utilized stage (likely bottleneck): {bottleneck}")
+
+    result = None
+    if final_step is not None:
+        start = time.perf_counter()
+        result = final_step(feature_df)
+        print(f"Final step: {time.perf_counter() - start:.1f}s (after the pipelined stages)")
+    return feature_df, result, report
@@ -0,0 +1,151 @@
+from src.utils.get_type_chart import get_type_chart
+from src.utils.get_effectiveness import get_effectiveness
+from src.utils.extract_survivors import extract_survivors
+from collections import Counter
+import time
+import numpy as np
+
+
+def build_combo_effectiveness_matrix(type_lookup: dict, names=None) -> tuple[dict, np.ndarray]:
+    """
+    Precomputes the average effectiveness between every pair of type combos found in type_lookup.
+    Combo 0 is the empty combo (unknown Pokémon), which gives an effectiveness of 1.0 like get_effectiveness.
+    Args:
+        type_lookup: dict Pokémon name -> types
+        names: optional Pokémon names to restrict the matrix to (the matrix is quadratic in the number of combos)
+    Returns:
+        combo_index: dict type combo (tuple) -> combo ID
+        combo_matrix: array (n_combos, n_combos), attacker combo x defender combo
+    """
+    type_chart = get_type_chart()
+    if names is not None:
+        type_lookup = {name: type_lookup[name] for name in names if name in type_lookup}
+    combo_index = {(): 0}
+    for types in type_lookup.values():
+        combo_index.setdefault(tuple(types), len(combo_index))
+
+    combos = list(combo_index)
+    combo_matrix = np.ones((len(combos), len(combos)))
+    for i, atk_types in enumerate(combos):
+        for j, def_types in enumerate(combos):
+            if atk_types and def_types:
+                total = sum(type_chart.get(a, {}).get(d, 1.0) for a in atk_types for d in def_types)
+                combo_matrix[i, j] = total / (len(atk_types) * len(def_types))
+    return combo_index, combo_matrix
+
+
+def pad_survivors(survivors: list[tuple], type_lookup: dict, combo_index: dict, width: int = 6) -> tuple:
+    """
+    Turns per-battle survivor lists into padded arrays, one row per battle.
+    Repeated names are merged into one slot whose weight is the number of repeats,
+    so the batch score keeps the same weighting as the per-pair loop.
+    Args:
+        survivors: list of (p1_alive, p2_alive, p1_hp_alive, p2_hp_alive) as returned by extract_survivors
+        type_lookup: dict Pokémon name -> types
+        combo_index: dict type combo -> combo ID, from build_combo_effectiveness_matrix
+        width: minimum number of slots per side (grown if a battle has more distinct survivors)
+    Returns:
+        p1_ids, p1_hp, p1_weight, p2_ids, p2_hp, p2_weight: arrays (n_battles, width), weight 0 = padding
+    """
+    p1_counts = [Counter(s[0]) for s in survivors]
+    p2_counts = [Counter(s[1]) for s in survivors]
+    width = max([width] + [len(c) for c in p1_counts] + [len(c) for c in p2_counts])
+
+    def fill(counts_list, hp_dicts):
+        ids = np.zeros((len(counts_list), width), dtype=np.int64)
+        hp = np.zeros((len(counts_list), width))
+        weight = np.zeros((len(counts_list), width))
+        for row, (counts, hp_alive) in enumerate(zip(counts_list, hp_dicts)):
+            for col, (name, count) in enumerate(counts.items()):
+                ids[row, col] = combo_index.get(tuple(type_lookup.get(name, [])), 0)
+                hp[row, col] = hp_alive.get(name, 1.0)
+                weight[row, col] = count
+        return ids, hp, weight
+
+    p1_ids, p1_hp, p1_weight = fill(p1_counts, [s[2] for s in survivors])
+    p2_ids, p2_hp, p2_weight = fill(p2_counts, [s[3] for s in survivors])
+    return p1_ids, p1_hp, p1_weight, p2_ids, p2_hp, p2_weight
+
+
+def batch_type_hp_match_score(p1_ids, p1_hp, p1_weight, p2_ids, p2_hp, p2_weight,
+                              combo_matrix: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+    """
+    type_hp_match_score for all battles at once, by broadcasting P1 slots against P2 slots.
+    Works on chunks of batch_size battles to bound the (battles x 6 x 6) intermediates.
+    Returns:
+        scores: array (n_battles,), 0 when a side has no survivor
+    """
+    scores = np.zeros(len(p1_ids))
+    for start in range(0, len(p1_ids), batch_size):
+        sl = slice(start, start + batch_size)
+        eff = combo_matrix[p1_ids[sl][:, :, None], p2_ids[sl][:, None, :]]
+        hp_weight = p1_hp[sl][:, :, None] - p2_hp[sl][:, None, :]
+        pair_weight = p1_weight[sl][:, :, None] * p2_weight[sl][:, None, :]
+        matchup_sum = (eff * hp_weight * pair_weight).sum(axis=(1, 2))
+        matchup_count = pair_weight.sum(axis=(1, 2))
+        scores[sl] = np.divide(matchup_sum, matchup_count,
+                               out=np.zeros_like(matchup_sum), where=matchup_count > 0)
+    return scores
+
+
+def type_hp_match_scores(survivors: list[tuple], type_lookup: dict) -> np.ndarray:
+    """
+    Builds the combo matrix, pads the survivors and runs the batch kernel.
+    Only the combos of the Pokémon present in survivors go in the matrix, so scoring a single battle stays cheap.
+    """
+    names = {name for s in survivors for name in s[0] + s[1]}
+    combo_index, combo_matrix = build_combo_effectiveness_matrix(type_lookup, names)
+    padded = pad_survivors(survivors, type_lookup, combo_index)
+    return batch_type_hp_match_score(*padded, combo_matrix)
+
+
+def loop_type_hp_match_score(p1_alive, p2_alive, p1_hp_alive, p2_hp_alive, type_lookup: dict) -> float:
+    """Reference per-battle version (nested loops over survivors)."""
+    matchup_sum = matchup_count = 0
+    for p1_name in p1_alive:
+        p1_types_local = type_lookup.get(p1_name, [])
+        for p2_name in p2_alive:
+            p2_types_local = type_lookup.get(p2_name, [])
+            eff = get_effectiveness(p1_types_local, p2_types_local)
+            hp_weight = p1_hp_alive.get(p1_name, 1.0) - p2_hp_alive.get(p2_name, 1.0)
+            matchup_sum += eff * hp_weight
+            matchup_count += 1
+    return matchup_sum / matchup_count if matchup_count else 0
+
+
+def benchmark_type_hp_match_score(data: list[dict], type_lookup: dict, n_repeats: int = 3) -> dict:
+    """
+    Compares the loop and batch versions of type_hp_match_score on a whole dataset.
+    Survivor extraction is done once and is not timed.
+    Returns:
+        dict with timings (best of n_repeats), throughput in battles/s, speedup and max absolute difference
+    """
+    survivors = [extract_survivors(b)[:4] for b in data if b.get('battle_timeline')]
+
+    loop_times, batch_times = [], []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        loop_scores = np.array([loop_type_hp_match_score(*s, type_lookup) for s in survivors])
+        loop_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch_scores = type_hp_match_scores(survivors, type_lookup)
+        batch_times.append(time.perf_counter() - start)
+
+    max_diff = float(np.max(np.abs(loop_scores - batch_scores))) if len(survivors) else 0.0
+    results = {
+        'n_battles': len(survivors),
+        'loop_s': min(loop_times),
+        'batch_s': min(batch_times),
+        'loop_battles_per_s': len(survivors) / min(loop_times) if min(loop_times) else float('inf'),
+        'batch_battles_per_s': len(survivors) / min(batch_times) if min(batch_times) else float('inf'),
+        'speedup': min(loop_times) / min(batch_times) if min(batch_times) else float('inf'),
+        'max_abs_diff': max_diff,
+        'match': bool(np.allclose(loop_scores, batch_scores)),
+    }
+
+    print(f"Battles: {results['n_battles']}")
+    print(f"Loop : {results['loop_s']:.4f}s ({results['loop_battles_per_s']:.0f} battles/s)")
+    print(f"Batch: {results['batch_s']:.4f}s ({results['batch_battles_per_s']:.0f} battles/s)")
+    print(f"Speedup: x{results['speedup']:.1f} | max abs diff: {max_diff:.2e} | match: {results['match']}")
+    return results
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import warnings
+from collections import defaultdict
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedGroupKFold
+from tqdm.notebook import tqdm # type: ignore
+
+CONTENT_KEYS = ('p1_team_details', 'p2_lead_details', 'battle_timeline')
+
+
+def _canonical(value, n_decimals):
+    if isinstance(value, float):
+        return round(value, n_decimals)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v, n_decimals) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v, n_decimals) for v in value]
+    if isinstance(value, str):
+        return value.lower()
+    return value
+
+
+def battle_content_hash(battle: dict, n_decimals: int = 3) -> str:
+    """
+    Canonical content hash of a battle: team details + P2 lead + timeline, ignoring battle_id and the label.
+    Keys are sorted, strings lowercased and floats rounded to n_decimals, so records logged by different
+    collectors (key order, casing, float noise) get the same hash.
+    """
+    content = {key: _canonical(battle.get(key), n_decimals) for key in CONTENT_KEYS}
+    payload = json.dumps(content, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _hash_job(args):
+    return battle_content_hash(*args)
+
+
+def hash_battles(data, n_workers=None, chunksize=256, n_decimals=3) -> list[str]:
+    """Content hashes of all battles, computed in worker processes and streamed back in order."""
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        return [battle_content_hash(b, n_decimals) for b in tqdm(data, desc="Hashing battles")]
+    with Pool(n_workers) as pool:
+        jobs = pool.imap(_hash_job, ((b, n_decimals) for b in data), chunksize=chunksize)
+        return list(tqdm(jobs, total=len(data) if hasattr(data, '__len__') else None, desc="Hashing battles"))
+
+
+def deduplicate_battles(data: list[dict], mode='drop', n_workers=None, n_decimals=3) -> tuple[list[dict], np.ndarray]:
+    """
+    Finds battles with the same content hash.
+    Args:
+        data: list of battle dictionaries
+        mode: 'drop' keeps the first battle of each duplicate group,
+              'group' keeps every battle (use the groups for group-aware splits)
+        n_workers: number of hashing processes
+        n_decimals: float rounding used by the hash
+    Returns:
+        battles: deduplicated (mode='drop') or original (mode='group') list of battles
+        groups: duplicate group ID of each returned battle (aligned with battles, not keyed by battle_id,
+                since collectors may reuse the same ID for different battles)
+    """
+    if mode not in ('drop', 'group'):
+        raise ValueError(f"Unknown mode '{mode}' (expected 'drop' or 'group')")
+    hashes = hash_battles(data, n_workers, n_decimals=n_decimals)
+
+    group_ids = {}
+    hashes_of_id = defaultdict(set)
+    labels = defaultdict(set)
+    kept, groups = [], []
+    for battle, h in zip(data, hashes):
+        is_new = h not in group_ids
+        group = group_ids.setdefault(h, len(group_ids))
+        hashes_of_id[battle.get('battle_id')].add(h)
+        if 'player_won' in battle:
+            labels[group].add(bool(battle['player_won']))
+        if is_new or mode == 'group':
+            kept.append(battle)
+            groups.append(group)
+
+    n_dup = len(data) - len(group_ids)
+    n_conflicts = sum(len(v) > 1 for v in labels.values())
+    n_reused_ids = sum(len(v) > 1 for v in hashes_of_id.values())
+    print(f"Battles: {len(data)} | unique: {len(group_ids)} | duplicates: {n_dup} "
+          f"({100 * n_dup / max(len(data), 1):.1f}% reduction)")
+    print(f"Duplicate groups with conflicting labels: {n_conflicts}")
+    if n_reused_ids:
+        warnings.warn(f"{n_reused_ids} battle_id(s) are shared by battles with different content; "
+                      "use the returned groups (aligned with the battles), not the battle IDs.")
+    if mode == 'drop':
+        print(f"Kept {len(kept)} battles.")
+    return kept, np.asarray(groups)
+
+
+def battle_groups(df: pd.DataFrame, battles: list[dict], groups) -> np.ndarray:
+    """
+    Duplicate group of each row of a feature DataFrame built from battles (in the same order).
+    The featuring modules keep the battle order and may skip battles without timeline,
+    so rows are matched by position and the battle_id sequence is checked.
+    """
+    groups = np.asarray(groups)
+    if len(df) != len(battles):
+        with_timeline = [i for i, b in enumerate(battles) if b.get('battle_timeline')]
+        battles = [battles[i] for i in with_timeline]
+        groups = groups[with_timeline]
+    ids = [b.get('battle_id') for b in battles]
+    if len(ids) != len(df) or list(df['battle_id']) != ids:
+        raise ValueError("Feature rows do not match the battles: build df from the battles returned "
+                         "by deduplicate_battles, without reordering")
+    return groups
+
+
+def group_train_test_split(X, y, groups, test_size=0.2, random_state=42):
+    """
+    Stratified train / validation split where a duplicate group never ends up on both sides.
+    Returns:
+        X_train, X_val, y_train, y_val, groups_train
+    """
+    n_splits = max(2, int(round(1 / test_size)))
+    cv = StratifiedGroupKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    train_idx, val_idx = next(cv.split(X, y, groups))
+    groups = np.asarray(groups)
+    return X.iloc[train_idx], X.iloc[val_idx], y.iloc[train_idx], y.iloc[val_idx], groups[train_idx]
@@ -0,0 +1,47 @@
+def extract_survivors(battle: dict, n_turns: int = 30) -> tuple[list, list, dict, dict, list, list]:
+    """
+    Pokémon still alive for each player at the end of the first n_turns rounds.
+    P2 survivors are collected turn by turn, so a name appears once per turn it was seen alive.
+    Returns:
+        p1_alive: lowercased names of P1 survivors
+        p2_alive: lowercased names of P2 survivors (one entry per turn seen alive)
+        p1_hp_alive: dict name -> last HP pct for P1 survivors
+        p2_hp_alive: dict name -> last HP pct for P2 survivors
+        p1_types: types of the P1 survivors
+        p2_types: types of the P2 lead while it is alive
+    """
+    battle_timeline = battle.get('battle_timeline', [])
+    p1_team = battle.get('p1_team_details', [])
+
+    p1_alive, p2_alive = [], []
+    p1_hp_alive, p2_hp_alive = {}, {}
+    p1_types, p2_types = [], []
+
+    for poke in p1_team:
+        name = poke.get('name')
+        last_state = None
+        for turn in reversed(battle_timeline[:n_turns]):
+            state = turn.get('p1_pokemon_state', {})
+            if isinstance(state, dict) and state.get('name') == name:
+                last_state = state
+                break
+        hp = last_state.get('hp_pct', 1.0) if last_state else 1.0
+        status = str(last_state.get('status', 'nostatus')) if last_state else 'nostatus'
+        if hp > 0 and 'fnt' not in status:
+            p1_alive.append(name.lower())
+            p1_hp_alive[name.lower()] = hp
+            p1_types.extend([t for t in poke.get('types', []) if t != 'notype'])
+
+    for turn in battle_timeline[:n_turns]:
+        state = turn.get('p2_pokemon_state', {})
+        if isinstance(state, dict):
+            name = state.get('name')
+            hp = state.get('hp_pct', 1.0)
+            status = str(state.get('status', 'nostatus'))
+            if name and hp > 0 and 'fnt' not in status:
+                p2_hp_alive[name.lower()] = hp
+                if 'p2_lead_details' in battle and battle['p2_lead_details'].get('name') == name:
+                    p2_types.extend([t for t in battle['p2_lead_details'].get('types', []) if t != 'notype'])
+                p2_alive.append(name.lower())
+
+    return p1_alive, p2_alive, p1_hp_alive, p2_hp_alive, p1_types, p2_types
@@ -0,0 +1,159 @@
+import bz2
+import glob
+import gzip
+import lzma
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+COMPRESSED_EXTENSIONS = ('.gz', '.bz2', '.xz', '.lzma', '.zst')
+
+
+def get_json_loads(backend='auto'):
+    """
+    Returns (backend name, loads function), using the fastest JSON library installed
+    (orjson, then ujson, then the standard json module) when backend is 'auto'.
+    """
+    candidates = ['orjson', 'ujson', 'json'] if backend == 'auto' else [backend]
+    for name in candidates:
+        try:
+            module = __import__(name)
+        except ImportError:
+            continue
+        return name, module.loads
+    raise ImportError(f"JSON backend '{backend}' is not installed")
+
+
+def read_bytes(path) -> bytes:
+    """Reads a shard and decompresses it according to its extension (.gz, .bz2, .xz/.lzma, .zst)."""
+    if path.endswith('.gz'):
+        opener = gzip.open
+    elif path.endswith('.bz2'):
+        opener = bz2.open
+    elif path.endswith(('.xz', '.lzma')):
+        opener = lzma.open
+    elif path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading .zst shards requires the 'zstandard' package")
+        with open(path, 'rb') as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read()
+    else:
+        opener = open
+    with opener(path, 'rb') as f:
+        return f.read()
+
+
+def parse_shard(path, backend='auto') -> tuple[list[dict], int, int]:
+    """
+    Reads, decompresses and parses one shard.
+    .jsonl / .ndjson shards hold one battle per line, .json shards hold a list of battles (or a single one).
+    Returns:
+        records: list of battle dicts
+        compressed_bytes: size of the file on disk
+        raw_bytes: size after decompression
+    """
+    _, loads = get_json_loads(backend)
+    raw = read_bytes(path)
+
+    name = path
+    for ext in COMPRESSED_EXTENSIONS:
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+            break
+
+    if name.endswith(('.jsonl', '.ndjson')):
+        records = [loads(line) for line in raw.splitlines() if line.strip()]
+    else:
+        doc = loads(raw)
+        records = doc if isinstance(doc, list) else [doc]
+    return records, os.path.getsize(path), len(raw)
+
+
+def _parse_shard_args(args):
+    return parse_shard(*args)
+
+
+def load_battle_shards(paths, n_workers=None, executor='process', backend='auto',
+                       output='records', return_stats=False):
+    """
+    Loads battles from many (possibly compressed) JSON / JSONL shards in parallel.
+    Shards are decompressed and parsed in worker processes (or threads), results keep the shard order.
+
+    Args:
+        paths: glob pattern or list of shard paths
+        n_workers: number of workers (default: number of CPUs, capped by the number of shards)
+        executor: 'process' (parsing in parallel, records pickled back) or 'thread' (no copy, GIL-bound parsing)
+        backend: JSON backend ('auto', 'orjson', 'ujson' or 'json')
+        output: 'records' -> list[dict] as expected by the featuring modules,
+                'dataframe' -> one row per battle,
+                'timeline' -> one row per turn (flattened battle_timeline with battle_id)
+        return_stats: if True, also returns a dict with sizes, timings and MB/s
+
+    Returns:
+        data (and stats if return_stats)
+    """
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(paths))
+    if not paths:
+        raise FileNotFoundError("No shard to load")
+    n_workers = min(n_workers or os.cpu_count() or 1, len(paths))
+    backend_name, _ = get_json_loads(backend)
+
+    pool_cls = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    start = time.perf_counter()
+    if n_workers == 1:
+        results = [parse_shard(p, backend_name) for p in paths]
+    else:
+        with pool_cls(max_workers=n_workers) as pool:
+            results = list(pool.map(_parse_shard_args, [(p, backend_name) for p in paths]))
+
+    records = [battle for shard_records, _, _ in results for battle in shard_records]
+    elapsed = time.perf_counter() - start
+
+    compressed_mb = sum(r[1] for r in results) / 1e6
+    raw_mb = sum(r[2] for r in results) / 1e6
+    stats = {
+        'n_shards': len(paths),
+        'n_battles': len(records),
+        'n_workers': n_workers,
+        'executor': executor,
+        'backend': backend_name,
+        'seconds': elapsed,
+        'compressed_mb': compressed_mb,
+        'raw_mb': raw_mb,
+        'compressed_mb_per_s': compressed_mb / elapsed if elapsed else float('inf'),
+        'raw_mb_per_s': raw_mb / elapsed if elapsed else float('inf'),
+    }
+    print(f"Loaded {stats['n_battles']} battles from {stats['n_shards']} shards in {elapsed:.2f}s "
+          f"({n_workers} {executor} workers, {backend_name})")
+    print(f"{compressed_mb:.1f} MB on disk ({stats['compressed_mb_per_s']:.1f} MB/s) | "
+          f"{raw_mb:.1f} MB decompressed ({stats['raw_mb_per_s']:.1f} MB/s)")
+
+    if output == 'records':
+        data = records
+    elif output == 'dataframe':
+        data = pd.DataFrame.from_records(records)
+    elif output == 'timeline':
+        # battles without timeline contribute no rows
+        records = [{**r, 'battle_timeline': r.get('battle_timeline') or []} for r in records]
+        data = pd.json_normalize(records, record_path='battle_timeline', meta=['battle_id'], errors='ignore')
+    else:
+        raise ValueError(f"Unknown output '{output}' (expected 'records', 'dataframe' or 'timeline')")
+
+    return (data, stats) if return_stats else data
+
+
+def benchmark_loader(paths, worker_counts=(1, 2, 4, 8), executors=('process', 'thread'), backend='auto') -> pd.DataFrame:
+    """Loads the same shards with several worker counts / executors and compares the throughput."""
+    rows = []
+    for executor in executors:
+        for n_workers in worker_counts:
+            _, stats = load_battle_shards(paths, n_workers, executor, backend, return_stats=True)
+            rows.append(stats)
+    results = pd.DataFrame(rows)[['executor', 'n_workers', 'backend', 'seconds', 'raw_mb_per_s', 'compressed_mb_per_s']]
+    print(results.round(2).to_string(index=False))
+    return results
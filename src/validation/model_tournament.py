@@ -0,0 +1,152 @@
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import StackingClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, StratifiedGroupKFold
+
+from src.models.training1 import build_logistic_pipeline
+from src.models.training_stacked import build_base_learners, build_meta_model
+from src.models.training_distilled import measure_latency
+
+
+def make_shared_folds(y, n_splits=5, random_state=42, groups=None) -> list:
+    """
+    Stratified folds computed once and reused by every candidate (group-aware if groups is given).
+    Returns:
+        list of (train_idx, val_idx)
+    """
+    if groups is None:
+        cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    else:
+        cv = StratifiedGroupKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return list(cv.split(np.zeros(len(y)), y, groups))
+
+
+def default_candidates(random_state=42) -> dict:
+    """
+    Candidate configs of the tournament: name -> function returning a new unfitted model.
+    The logistic pipeline of train_logistic_model, each base learner of the stack, and the stack itself.
+    """
+    def base(name):
+        return lambda: dict(build_base_learners(random_state))[name]
+
+    return {
+        'logistic': lambda: build_logistic_pipeline(random_state=random_state),
+        'lgbm': base('lgbm'),
+        'xgb': base('xgb'),
+        'rf': base('rf'),
+        'stack': lambda: StackingClassifier(
+            estimators=build_base_learners(random_state), final_estimator=build_meta_model(random_state),
+            stack_method='predict_proba', passthrough=True, n_jobs=-1
+        ),
+    }
+
+
+def run_tournament(train_df, candidates=None, time_budget=600, n_splits=5, min_folds=2,
+                   keep_fraction=0.5, random_state=42, groups=None):
+    """
+    Evaluates candidate models on shared stratified folds within a wall-clock budget, then refits the winner.
+    Folds are played one at a time for all remaining candidates. From min_folds folds on, only the best
+    keep_fraction of the candidates (by mean accuracy so far) go on to the next fold.
+    Each candidate gets a slice of time_budget / n_candidates: a candidate whose first fold fit exceeds
+    its slice stops there (timeout, its first-fold scores are kept). From the second fold on, a candidate
+    whose mean fit time exceeds its share of the remaining budget stops.
+
+    Args:
+        train_df: DataFrame containing feature columns and 'player_won'
+        candidates: dict name -> function returning an unfitted model (default: default_candidates())
+        time_budget: wall-clock budget in seconds for the fold evaluations
+        n_splits: number of shared folds
+        min_folds: number of folds played by every candidate before eliminations
+        keep_fraction: fraction of the candidates kept after each fold from min_folds on
+        random_state: int, for reproducibility
+        groups: optional duplicate group of each row (see deduplicate_battles)
+
+    Returns:
+        winner_model: winner refitted on the whole train_df
+        features: list of columns/features used
+        leaderboard: DataFrame with accuracy, ROC-AUC, fit time, predict latency and status per candidate
+    """
+    candidates = candidates or default_candidates(random_state)
+    features = [c for c in train_df.columns if c not in ['battle_id', 'player_won']]
+    X = train_df[features]
+    y = train_df['player_won'].astype(int)
+    folds = make_shared_folds(y, n_splits, random_state, groups)
+
+    results = {name: {'acc': [], 'auc': [], 'fit_time': [], 'status': 'running', 'model': None}
+               for name in candidates}
+    time_slice = time_budget / len(candidates)
+    start_all = time.perf_counter()
+    print(f"Tournament: {len(candidates)} candidates, {n_splits} shared folds, budget {time_budget}s")
+
+    for k, (train_idx, val_idx) in enumerate(folds):
+        alive = [name for name, r in results.items() if r['status'] == 'running']
+        for name in alive:
+            r = results[name]
+            remaining = time_budget - (time.perf_counter() - start_all)
+            n_running = sum(res['status'] == 'running' for res in results.values())
+            expected = np.mean(r['fit_time']) if r['fit_time'] else 0.0
+            if remaining <= 0 or expected > remaining / n_running:
+                r['status'] = 'timeout'
+                print(f"  [fold {k + 1}] {name}: out of time (expected fit {expected:.1f}s > "
+                      f"{max(remaining, 0) / n_running:.1f}s)")
+                continue
+
+            model = candidates[name]()
+            start = time.perf_counter()
+            model.fit(X.iloc[train_idx], y.iloc[train_idx])
+            r['fit_time'].append(time.perf_counter() - start)
+            proba = model.predict_proba(X.iloc[val_idx])[:, 1]
+            r['acc'].append(accuracy_score(y.iloc[val_idx], (proba >= 0.5).astype(int)))
+            r['auc'].append(roc_auc_score(y.iloc[val_idx], proba))
+            r['model'] = model
+            print(f"  [fold {k + 1}] {name}: accuracy {r['acc'][-1]:.4f} | AUC {r['auc'][-1]:.4f} "
+                  f"| fit {r['fit_time'][-1]:.1f}s")
+            if k == 0 and r['fit_time'][0] > time_slice:
+                r['status'] = 'timeout'
+                print(f"  [fold {k + 1}] {name}: first fit over its slice ({time_slice:.1f}s), stopped")
+
+        # Early elimination on partial-fold scores
+        alive = [name for name, r in results.items() if r['status'] == 'running']
+        if min_folds <= k + 1 < len(folds) and len(alive) > 1:
+            ranked = sorted(alive, key=lambda n: np.mean(results[n]['acc']), reverse=True)
+            n_keep = max(1, math.ceil(len(ranked) * keep_fraction))
+            for name in ranked[n_keep:]:
+                results[name]['status'] = 'eliminated'
+                print(f"  [fold {k + 1}] {name}: eliminated")
+
+    # Winner: best mean accuracy, candidates still running first
+    played = [name for name, r in results.items() if r['acc']]
+    if not played:
+        raise RuntimeError("No candidate finished a fold within the time budget")
+    winner = max(played, key=lambda n: (results[n]['status'] == 'running', np.mean(results[n]['acc'])))
+    results[winner]['status'] = 'winner'
+
+    print(f"\nRefitting winner '{winner}' on {len(X)} battles...")
+    winner_model = candidates[winner]()
+    start = time.perf_counter()
+    winner_model.fit(X, y)
+    refit_time = time.perf_counter() - start
+
+    rows = []
+    for name, r in results.items():
+        rows.append({
+            'model': name,
+            'status': r['status'],
+            'folds': len(r['acc']),
+            'accuracy': np.mean(r['acc']) if r['acc'] else np.nan,
+            'accuracy_std': np.std(r['acc']) if r['acc'] else np.nan,
+            'roc_auc': np.mean(r['auc']) if r['auc'] else np.nan,
+            'fit_time_s': np.mean(r['fit_time']) if r['fit_time'] else np.nan,
+            'predict_ms_per_row': (measure_latency(r['model'], X.iloc[:200], n_rows=50, batch_repeats=1)['latency_ms_p50']
+                                   if r['model'] is not None else np.nan),
+        })
+    leaderboard = (pd.DataFrame(rows).sort_values(['folds', 'accuracy'], ascending=False)
+                   .set_index('model'))
+
+    print(f"\nLeaderboard ({time.perf_counter() - start_all:.1f}s, winner refit {refit_time:.1f}s):")
+    print(leaderboard.round(4).to_string())
+    return winner_model, features, leaderboard
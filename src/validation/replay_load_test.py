@@ -0,0 +1,274 @@
+import json
+import os
+import random
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def make_scorer(create_features, model, features, **feature_kwargs):
+    """
+    Featurization + prediction path for one battle, as it would run live.
+    Args:
+        create_features: create_simple_features of featuring1, featuring2 or featuring3
+        model: fitted model with predict_proba
+        features: list of columns/features used by the model
+        feature_kwargs: extra arguments of create_features (type_lookup, all_p2_pokemons...)
+    Returns:
+        score(battle) -> probability that P1 wins
+    """
+    def score(battle):
+        df = create_features([battle], verbose=False, **feature_kwargs)
+        if df.empty:
+            return 0.5
+        X = df.reindex(columns=features, fill_value=0)
+        return float(model.predict_proba(X)[0, 1])
+    return score
+
+
+def replay_requests(data: list[dict], n_turns: int = 30, turn_step: int = 1) -> list[dict]:
+    """
+    Turns recorded battles into live requests: one request per battle every turn_step turns,
+    holding the timeline seen so far. Battles advance together (turn 1 of every battle, then turn 2...).
+    """
+    requests = []
+    for t in range(turn_step, n_turns + 1, turn_step):
+        for battle in data:
+            timeline = battle.get('battle_timeline', [])
+            if len(timeline) >= t:
+                partial = {k: v for k, v in battle.items() if k not in ('battle_timeline', 'player_won')}
+                partial['battle_timeline'] = timeline[:t]
+                requests.append(partial)
+    return requests
+
+
+def synthesize_battles(data: list[dict], n_battles: int, hp_noise: float = 0.05, random_state: int = 42) -> list[dict]:
+    """Synthetic battles made by resampling recorded ones with new IDs and jittered HP."""
+    rng = random.Random(random_state)
+    synthetic = []
+    for i in range(n_battles):
+        battle = json.loads(json.dumps(rng.choice(data)))
+        battle['battle_id'] = f"synthetic_{i}"
+        for turn in battle.get('battle_timeline', []):
+            for player in ('p1_pokemon_state', 'p2_pokemon_state'):
+                state = turn.get(player)
+                if isinstance(state, dict) and state.get('hp_pct', 0) > 0:
+                    state['hp_pct'] = min(1.0, max(0.01, state['hp_pct'] + rng.uniform(-hp_noise, hp_noise)))
+        synthetic.append(battle)
+    return synthetic
+
+
+class ResourceMonitor:
+    """
+    Samples CPU usage (% of one core) and RSS of the current process in a background thread.
+    Uses psutil when installed, /proc and os.times otherwise.
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+
+    def _rss_mb(self):
+        if self._process is not None:
+            return self._process.memory_info().rss / 1e6
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+        except (OSError, ValueError):
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+    def _cpu_time(self):
+        times = os.times()
+        return times.user + times.system
+
+    def _sample(self):
+        now, cpu = time.perf_counter(), self._cpu_time()
+        self.samples.append({
+            't': now - self._start,
+            'cpu_pct': 100 * (cpu - self._last_cpu) / max(now - self._last_wall, 1e-9),
+            'rss_mb': self._rss_mb(),
+        })
+        self._last_wall, self._last_cpu = now, cpu
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._start = self._last_wall = time.perf_counter()
+        self._last_cpu = self._cpu_time()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def to_frame(self):
+        return pd.DataFrame(self.samples, columns=['t', 'cpu_pct', 'rss_mb'])
+
+
+# Local socket endpoint: one JSON battle per line in, one JSON {"p": proba} per line out
+
+class _ScoringHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                reply = {'p': self.server.scorer(json.loads(line))}
+            except Exception as e:
+                reply = {'error': str(e)}
+            self.wfile.write((json.dumps(reply) + '\n').encode())
+            self.wfile.flush()
+
+
+def serve_scorer(scorer, host='127.0.0.1', port=0):
+    """
+    Serves a scorer on a local TCP socket in a background thread.
+    Returns:
+        server (call server.shutdown() when done), (host, port) address
+    """
+    server = socketserver.ThreadingTCPServer((host, port), _ScoringHandler)
+    server.daemon_threads = True
+    server.scorer = scorer
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address
+
+
+def make_socket_scorer(address):
+    """Client side of serve_scorer: score(battle) over one persistent connection per thread."""
+    local = threading.local()
+
+    def score(battle):
+        if not hasattr(local, 'conn'):
+            local.conn = socket.create_connection(address)
+            local.file = local.conn.makefile('rwb')
+        local.file.write((json.dumps(battle) + '\n').encode())
+        local.file.flush()
+        reply = json.loads(local.file.readline())
+        if 'error' in reply:
+            raise RuntimeError(reply['error'])
+        return reply['p']
+    return score
+
+
+def run_load_test(scorer, requests: list[dict], rate=None, concurrency=4, label='run',
+                  results_dir='load_tests', monitor_interval=0.5, config=None) -> dict:
+    """
+    Sends the requests to the scorer and measures latency, throughput and resource usage.
+    With a rate, requests are sent open-loop at that many requests/s and latency is measured
+    from the scheduled send time (queueing included); without, concurrency workers send back to back.
+    Latency percentiles are computed over successful requests; failed ones are counted in errors.
+
+    Args:
+        scorer: score(battle) function (make_scorer, or make_socket_scorer for the socket endpoint)
+        requests: list of battles, e.g. from replay_requests
+        rate: target requests per second (None = as fast as possible)
+        concurrency: number of concurrent workers
+        label: name of the run (e.g. 'featuring3_stacked')
+        results_dir: where the latencies, resources and summary are saved (None = not saved)
+        config: optional dict stored in the summary (featuring variant, model type...)
+
+    Returns:
+        summary dict
+    """
+    latencies = np.zeros(len(requests))
+    service = np.zeros(len(requests))
+    failed = np.zeros(len(requests), dtype=bool)
+
+    def call(i, scheduled):
+        start = time.perf_counter()
+        try:
+            scorer(requests[i])
+        except Exception:
+            failed[i] = True
+        end = time.perf_counter()
+        service[i] = end - start
+        latencies[i] = end - (scheduled if scheduled is not None else start)
+
+    print(f"Load test '{label}': {len(requests)} requests, rate={rate or 'max'}, concurrency={concurrency}")
+    with ResourceMonitor(monitor_interval) as monitor, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        t0 = time.perf_counter()
+        futures = []
+        for i in range(len(requests)):
+            scheduled = None
+            if rate:
+                scheduled = t0 + i / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(pool.submit(call, i, scheduled))
+        for f in futures:
+            f.result()
+        duration = time.perf_counter() - t0
+
+    resources = monitor.to_frame()
+    lat_ms = latencies * 1000
+    # latency stats over successful requests only, failures are counted in errors
+    ok_ms = lat_ms[~failed]
+    ok_service_ms = service[~failed] * 1000
+    summary = {
+        'label': label,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'n_requests': len(requests),
+        'errors': int(failed.sum()),
+        'rate': rate,
+        'concurrency': concurrency,
+        'duration_s': duration,
+        'throughput_rps': len(requests) / duration if duration else float('inf'),
+        'latency_ms_p50': float(np.percentile(ok_ms, 50)) if len(ok_ms) else float('nan'),
+        'latency_ms_p95': float(np.percentile(ok_ms, 95)) if len(ok_ms) else float('nan'),
+        'latency_ms_p99': float(np.percentile(ok_ms, 99)) if len(ok_ms) else float('nan'),
+        'latency_ms_max': float(ok_ms.max()) if len(ok_ms) else float('nan'),
+        'service_ms_mean': float(ok_service_ms.mean()) if len(ok_service_ms) else float('nan'),
+        'cpu_pct_mean': float(resources['cpu_pct'].mean()) if len(resources) else float('nan'),
+        'cpu_pct_max': float(resources['cpu_pct'].max()) if len(resources) else float('nan'),
+        'rss_mb_max': float(resources['rss_mb'].max()) if len(resources) else float('nan'),
+        **(config or {}),
+    }
+
+    print(f"Throughput: {summary['throughput_rps']:.1f} req/s | errors: {summary['errors']}")
+    print(f"Latency p50 / p95 / p99: {summary['latency_ms_p50']:.2f} / "
+          f"{summary['latency_ms_p95']:.2f} / {summary['latency_ms_p99']:.2f} ms")
+    print(f"CPU mean: {summary['cpu_pct_mean']:.0f}% | RSS max: {summary['rss_mb_max']:.0f} MB")
+
+    if results_dir:
+        os.makedirs(results_dir, exist_ok=True)
+        run_id = f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        pd.DataFrame({'latency_ms': lat_ms, 'service_ms': service * 1000, 'failed': failed}).to_csv(
+            os.path.join(results_dir, f"{run_id}_latencies.csv"), index=False)
+        resources.to_csv(os.path.join(results_dir, f"{run_id}_resources.csv"), index=False)
+        with open(os.path.join(results_dir, f"{run_id}_summary.json"), 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+        print(f"Results saved in '{results_dir}' as '{run_id}_*'")
+
+    return summary
+
+
+def compare_load_tests(results_dir='load_tests') -> pd.DataFrame:
+    """Loads every saved summary of results_dir into one table, one row per run."""
+    rows = []
+    for name in sorted(os.listdir(results_dir)):
+        if name.endswith('_summary.json'):
+            with open(os.path.join(results_dir, name)) as f:
+                rows.append(json.load(f))
+    comparison = pd.DataFrame(rows)
+    if len(comparison):
+        comparison = comparison.set_index('label')
+        cols = ['throughput_rps', 'latency_ms_p50', 'latency_ms_p95', 'latency_ms_p99', 'cpu_pct_mean', 'rss_mb_max']
+        print(comparison[cols].round(2).to_string())
+    return comparison
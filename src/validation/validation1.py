@@ -6,11 +6,11 @@ from sklearn.metrics import (
     accuracy_score, f1_score, roc_auc_score,
     confusion_matrix, classification_report
 )
-from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.model_selection import StratifiedKFold, StratifiedGroupKFold, cross_val_score
 import numpy as np
 
 
-def cross_validate_model(model, X_train, y_train, n_splits=5, random_state=42):
+def cross_validate_model(model, X_train, y_train, n_splits=5, random_state=42, groups=None):
     """
     Performs stratified cross-validation on the given model.
 
@@ -20,6 +20,7 @@ def cross_validate_model(model, X_train, y_train, n_splits=5, random_state=42):
         y_train: Series or array of labels
         n_splits: number of folds for StratifiedKFold
         random_state: seed for reproducibility
+        groups: optional duplicate group of each row (see battle_groups), kept within a single fold
     Returns:
         cv_scores: array of Accuracy scores for each fold
         mean_score: mean of the scores
@@ -27,12 +28,16 @@ def cross_validate_model(model, X_train, y_train, n_splits=5, random_state=42):
     """
     print("\nPerforming {}-Fold Stratified Cross-Validation on the model...".format(n_splits))
     
-    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    if groups is None:
+        cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    else:
+        cv = StratifiedGroupKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
     
     cv_scores = cross_val_score(
         model,
         X_train,
         y_train,
+        groups=groups,
         cv=cv,
         scoring='accuracy',
         n_jobs=-1